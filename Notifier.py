@@ -6,23 +6,45 @@ Notification module (Strategy Pattern) for security detector.
 - ConsoleNotifier: colored terminal output by severity level
 - MatrixNotifier: send message to Matrix room via requests
 - NotificationManager: fan-out to multiple notifiers with severity filtering
+  (notify() for a single event, notify_async() for asyncio callers,
+  notify_many() for a batch of events at once)
+  Remote notifiers are batched: events within flush_interval_ms (or up to
+  batch_max of them) go out in a single send_batch() call.
 
 Expected input data (from analyzer.py):
     { 'time': ..., 'path': ..., 'action': ..., 'score': int, 'level': 'Info'|'Warning'|'Critical', ... }
 
 Dependencies:
     pip install requests
+    pip install orjson   # optional, faster JSON encoding (stdlib json otherwise)
 """
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import html
+import io
+import itertools
 import json
+import sys
+import threading
 import time
 from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Literal, Optional, Sequence, Tuple
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Literal, Mapping, Optional, Sequence, Set, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 Level = Literal["Info", "Warning", "Critical"]
 
@@ -30,7 +52,7 @@ Level = Literal["Info", "Warning", "Critical"]
 # ----------------------------
 # Severity helpers
 # ----------------------------
-_LEVEL_ORDER: Dict[str, int] = {"Info": 10, "Warning": 20, "Critical": 30}
+_LEVEL_ORDER: Mapping[str, int] = MappingProxyType({"Info": 10, "Warning": 20, "Critical": 30})
 
 
 def level_value(level: str) -> int:
@@ -41,6 +63,33 @@ def should_notify(level: str, minimum_level: str) -> bool:
     return level_value(level) >= level_value(minimum_level)
 
 
+# ----------------------------
+# JSON helpers (orjson when available)
+# ----------------------------
+def _json_bytes(obj: Any, *, indent: bool = False, default: Any = None) -> bytes:
+    """UTF-8 encoded JSON (non-ASCII kept as-is)."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=default, option=orjson.OPT_INDENT_2 if indent else None)
+    return _stdlib_dumps(obj, indent=indent, default=default).encode("utf-8")
+
+
+def _json_str(obj: Any, *, indent: bool = False) -> str:
+    if orjson is not None:
+        return _json_bytes(obj, indent=indent).decode("utf-8")
+    return _stdlib_dumps(obj, indent=indent)
+
+
+def _stdlib_dumps(obj: Any, *, indent: bool = False, default: Any = None) -> str:
+    # Same layout as orjson: compact, or 2-space indent with ": " after keys
+    return json.dumps(
+        obj,
+        ensure_ascii=False,
+        indent=2 if indent else None,
+        separators=(",", ": ") if indent else (",", ":"),
+        default=default,
+    )
+
+
 def format_event_line(data: Dict[str, Any]) -> str:
     t = data.get("time", "?")
     level = data.get("level", "?")
@@ -56,12 +105,26 @@ def format_event_line(data: Dict[str, Any]) -> str:
 class BaseNotifier(ABC):
     """
     Strategy interface. Concrete notifiers implement send().
+
+    sync: if True, NotificationManager calls send() inline on the caller's thread
+          (keeps output ordering); otherwise it is dispatched to a worker pool.
     """
 
+    sync: bool = False
+
     @abstractmethod
     def send(self, data: Dict[str, Any]) -> None:
         raise NotImplementedError
 
+    def send_batch(self, events: Sequence[Dict[str, Any]]) -> None:
+        """Send several events at once. Default falls back to one send() per event."""
+        for data in events:
+            self.send(data)
+
+    def close(self) -> None:
+        """Release resources held by the notifier (no-op by default)."""
+        return None
+
 
 # ----------------------------
 # Console notifier
@@ -69,8 +132,16 @@ class BaseNotifier(ABC):
 class ConsoleNotifier(BaseNotifier):
     """
     Prints messages to the terminal with ANSI colors per severity.
+
+    When stdout is not a terminal (piped / redirected to a log), colors are
+    dropped and output is buffered: it is written once flush_events lines are
+    waiting or flush_interval_ms after the first buffered line, whichever
+    comes first. close() writes anything still buffered.
     """
 
+    # Printed inline so lines keep the order events arrived in
+    sync = True
+
     # ANSI escape codes (no external deps)
     _RESET = "\033[0m"
     _BOLD = "\033[1m"
@@ -80,9 +151,36 @@ class ConsoleNotifier(BaseNotifier):
     _COLOR_WARNING = "\033[33m"   # yellow
     _COLOR_CRITICAL = "\033[31m"  # red
 
-    def __init__(self, *, include_json: bool = False) -> None:
+    def __init__(
+        self,
+        *,
+        include_json: bool = False,
+        flush_events: int = 16,
+        flush_interval_ms: int = 100,
+    ) -> None:
         self._include_json = include_json
 
+        # Only the TTY decision is made once; the stream itself is looked up per
+        # write (like print()) so redirect_stdout / test capture still work.
+        isatty = getattr(sys.stdout, "isatty", None)
+        self._is_tty = bool(isatty and isatty())
+        if not self._is_tty:
+            # ANSI codes are just noise in a log file
+            self._RESET = self._BOLD = self._DIM = ""
+            self._COLOR_INFO = self._COLOR_WARNING = self._COLOR_CRITICAL = ""
+
+        self._buf = io.StringIO()
+        self._buffered = 0
+        self._flush_events = max(1, flush_events)
+        self._flush_interval = flush_interval_ms / 1000.0
+        self._flush_timer: Optional[threading.Timer] = None
+        self._buf_lock = threading.Lock()
+
+        # Colored level label per known level, built once
+        self._prefixes: Dict[str, str] = {
+            lvl: self._prefix_for(lvl) for lvl in ("Info", "Warning", "Critical")
+        }
+
     def _color_for(self, level: str) -> str:
         if level == "Critical":
             return self._COLOR_CRITICAL
@@ -90,19 +188,73 @@ class ConsoleNotifier(BaseNotifier):
             return self._COLOR_WARNING
         return self._COLOR_INFO
 
-    def send(self, data: Dict[str, Any]) -> None:
+    def _prefix_for(self, level: str) -> str:
+        return f"{self._BOLD}{self._color_for(level)}{level}{self._RESET}"
+
+    def _render(self, data: Dict[str, Any]) -> str:
         level = str(data.get("level", "Info"))
-        color = self._color_for(level)
+        prefix = self._prefixes.get(level)
+        if prefix is None:
+            prefix = self._prefix_for(level)
+
+        # Same layout as format_event_line(), with the colored level built in
+        pretty = (
+            f"[{data.get('time', '?')}] {prefix} (score={data.get('score', '?')}) "
+            f"{data.get('action', '?')}: {data.get('path', '?')}"
+        )
 
-        line = format_event_line(data)
-        prefix = f"{self._BOLD}{color}{level}{self._RESET}"
-        # Replace the first occurrence of level in the formatted line for a nicer look
-        pretty = line.replace(level, prefix, 1)
+        if self._include_json:
+            pretty += f"\n{self._DIM}{_json_str(data)}{self._RESET}"
+        return pretty
+
+    def _write(self, text: str, count: int) -> None:
+        if self._is_tty:
+            # Interactive: show immediately, one write call per send
+            out = sys.stdout
+            out.write(text)
+            out.flush()
+            return
+
+        with self._buf_lock:
+            self._buf.write(text)
+            self._buffered += count
+            if self._buffered < self._flush_events:
+                if self._flush_timer is None:
+                    timer = threading.Timer(self._flush_interval, self.flush)
+                    timer.daemon = True
+                    self._flush_timer = timer
+                    timer.start()
+                return
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        timer, self._flush_timer = self._flush_timer, None
+        if timer is not None:
+            timer.cancel()  # no-op when flush() runs on the timer thread itself
+        text = self._buf.getvalue()
+        if not text:
+            return
+        self._buf = io.StringIO()
+        self._buffered = 0
+        out = sys.stdout
+        out.write(text)
+        out.flush()
+
+    def flush(self) -> None:
+        """Write out any buffered lines now."""
+        with self._buf_lock:
+            self._flush_locked()
 
-        print(pretty)
+    def send(self, data: Dict[str, Any]) -> None:
+        self._write(self._render(data) + "\n", 1)
 
-        if self._include_json:
-            print(f"{self._DIM}{json.dumps(data, ensure_ascii=False)}{self._RESET}")
+    def send_batch(self, events: Sequence[Dict[str, Any]]) -> None:
+        if events:
+            # One write for the whole batch instead of one per event
+            self._write("".join([self._render(data) + "\n" for data in events]), len(events))
+
+    def close(self) -> None:
+        self.flush()
 
 
 # ----------------------------
@@ -124,23 +276,49 @@ class MatrixNotifier(BaseNotifier):
     Sends a text message to a Matrix room using client-server API.
 
     Uses:
-        POST /_matrix/client/v3/rooms/{roomId}/send/m.room.message/{txnId}
+        PUT /_matrix/client/v3/rooms/{roomId}/send/m.room.message/{txnId}
 
     Note:
-      - This is a minimal implementation. For production use, consider retries/backoff
-        and a dedicated Matrix SDK.
+      - A single requests.Session is reused for every send, so HTTP keep-alive,
+        pooled sockets and TLS session resumption apply across events.
+      - Transient failures (429/502/503/504) are retried with a small backoff.
+      - send_batch() folds many events into one message (one request, one RTT).
+      - Call close() when done to release pooled connections.
     """
 
     def __init__(self, config: MatrixConfig) -> None:
         self._cfg = config
         self._base = self._cfg.homeserver_url.rstrip("/")
-
-    def _endpoint(self, txn_id: str) -> str:
+        # Room is fixed for the notifier's lifetime: quote it once, append txn_id per send.
         room = requests.utils.quote(self._cfg.room_id, safe="")
-        return f"{self._base}/_matrix/client/v3/rooms/{room}/send/m.room.message/{txn_id}"
+        self._url_prefix = f"{self._base}/_matrix/client/v3/rooms/{room}/send/m.room.message/"
+        # Bodies are pre-encoded with _json_bytes, so the content type is fixed too
+        self._headers_cached: Dict[str, str] = {
+            "Authorization": f"Bearer {self._cfg.access_token}",
+            "Content-Type": "application/json",
+        }
 
-    def _headers(self) -> Dict[str, str]:
-        return {"Authorization": f"Bearer {self._cfg.access_token}"}
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.2,
+                status_forcelist=(429, 502, 503, 504),
+                # Default allowed methods include PUT; the homeserver dedups a
+                # retried PUT by its txn_id, so a retry never posts twice.
+            ),
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._session.headers.update(self._headers_cached)
+        self._txn_seq = itertools.count()
+
+    def _txn_id(self, count: int) -> str:
+        # ms timestamp + batch size, plus a sequence number so two batches of the
+        # same size in the same millisecond don't collide (Matrix dedups by txn_id)
+        return f"{int(time.time() * 1000)}-{count}-{next(self._txn_seq)}"
 
     def _build_body(self, data: Dict[str, Any]) -> Dict[str, Any]:
         # Keep it simple: human readable line + JSON fallback
@@ -151,25 +329,46 @@ class MatrixNotifier(BaseNotifier):
             # Include JSON as formatted block for clients that show it nicely
             "format": "org.matrix.custom.html",
             "formatted_body": (
-                f"<pre>{json.dumps(data, ensure_ascii=False, indent=2)}</pre>"
+                f"<pre>{_json_str(data, indent=True)}</pre>"
             ),
         }
 
+    def _build_batch_body(self, events: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+        lines = [format_event_line(data) for data in events]
+        items = "".join(f"<li>{html.escape(line)}</li>" for line in lines)
+        return {
+            "msgtype": self._cfg.message_type,
+            "body": "\n".join(lines),
+            "format": "org.matrix.custom.html",
+            "formatted_body": f"<ul>{items}</ul>",
+        }
+
     def send(self, data: Dict[str, Any]) -> None:
-        txn_id = str(int(time.time() * 1000))
-        url = self._endpoint(txn_id)
-        body = self._build_body(data)
+        self._put(self._txn_id(1), self._build_body(data))
+
+    def send_batch(self, events: Sequence[Dict[str, Any]]) -> None:
+        if not events:
+            return
+        if len(events) == 1:
+            self.send(events[0])
+            return
+        self._put(self._txn_id(len(events)), self._build_batch_body(events))
 
-        resp = requests.post(
+    def _put(self, txn_id: str, body: Dict[str, Any]) -> None:
+        url = self._url_prefix + txn_id
+
+        resp = self._session.put(
             url,
-            headers=self._headers(),
-            json=body,
+            data=_json_bytes(body),
             timeout=self._cfg.timeout_seconds,
             verify=self._cfg.verify_tls,
         )
         # Raise on non-2xx so the caller can handle/log it
         resp.raise_for_status()
 
+    def close(self) -> None:
+        self._session.close()
+
 
 # ----------------------------
 # Manager (fan-out + filtering)
@@ -181,26 +380,216 @@ class NotificationManager:
     Filtering:
       - minimum_level: only send if data['level'] >= minimum_level
       - per-notifier overrides supported via add_notifier(..., minimum_level=...)
+
+    Dispatch:
+      - notifiers with sync=True run inline in notify()
+      - all others are buffered per notifier and handed to a bounded thread pool
+        as one send_batch() call, either flush_interval_ms after the first
+        buffered event or as soon as batch_max events are waiting. A slow remote
+        sink never blocks the collector thread that called notify(). Batches for
+        one notifier are sent one after another, in the order events arrived.
+
+    Deduplication:
+      - events with the same values for dedup_keys within dedup_ttl seconds are
+        dropped before fan-out (at most dedup_max keys are remembered)
+      - dedup_ttl <= 0 or empty dedup_keys disables it
     """
 
-    def __init__(self, *, minimum_level: str = "Info") -> None:
+    def __init__(
+        self,
+        *,
+        minimum_level: str = "Info",
+        max_workers: int = 4,
+        flush_interval_ms: int = 50,
+        batch_max: int = 32,
+        dedup_keys: Sequence[str] = ("path", "action", "level"),
+        dedup_ttl: float = 5.0,
+        dedup_max: int = 8192,
+    ) -> None:
         self._default_min_level = minimum_level
-        self._items: List[Tuple[BaseNotifier, str]] = []
+        # (notifier, resolved minimum level value) - resolved once at registration
+        self._items: List[Tuple[BaseNotifier, int]] = []
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="notify")
+
+        self._flush_interval = flush_interval_ms / 1000.0
+        self._batch_max = max(1, batch_max)
+        self._pending: Dict[BaseNotifier, List[Dict[str, Any]]] = {}
+        self._pending_lock = threading.Lock()
+        self._flush_timer: Optional[threading.Timer] = None
+        self._closed = False
+        # Batches ready to send, per notifier, in order. At most one pool task
+        # drains a notifier's outbox at a time, so its batches never overlap.
+        # Guarded by _pending_lock as well.
+        self._outbox: Dict[BaseNotifier, "deque[List[Dict[str, Any]]]"] = {}
+        self._draining: Set[BaseNotifier] = set()
+
+        self._dedup_keys = tuple(dedup_keys)
+        self._dedup_ttl = dedup_ttl
+        self._dedup_max = max(1, dedup_max)
+        # digest -> last time sent (monotonic); insertion order = age, oldest first
+        self._dedup: "OrderedDict[bytes, float]" = OrderedDict()
+        self._dedup_lock = threading.Lock()
 
     def add_notifier(self, notifier: BaseNotifier, *, minimum_level: Optional[str] = None) -> None:
-        self._items.append((notifier, minimum_level or self._default_min_level))
+        self._items.append((notifier, level_value(minimum_level or self._default_min_level)))
+
+    def _is_duplicate(self, data: Dict[str, Any]) -> bool:
+        if self._dedup_ttl <= 0 or not self._dedup_keys:
+            return False
+        raw = _json_bytes([data.get(k) for k in self._dedup_keys], default=str)
+        key = hashlib.blake2b(raw, digest_size=16).digest()
+        now = time.monotonic()
+        with self._dedup_lock:
+            seen = self._dedup.get(key)
+            if seen is not None and now - seen < self._dedup_ttl:
+                return True
+            self._dedup[key] = now
+            self._dedup.move_to_end(key)
+            if len(self._dedup) > self._dedup_max:
+                self._dedup.popitem(last=False)
+        return False
 
     def notify(self, data: Dict[str, Any]) -> None:
-        level = str(data.get("level", "Info"))
+        if self._closed or self._is_duplicate(data):
+            return
+        lvl = level_value(str(data.get("level", "Info")))
 
-        for notifier, min_level in self._items:
-            if not should_notify(level, min_level):
+        for notifier, min_lvl in self._items:
+            if lvl < min_lvl:
+                continue
+            if notifier.sync:
+                self._safe_send(notifier, data)
+            else:
+                self._enqueue(notifier, data)
+
+    def notify_many(self, events: Sequence[Dict[str, Any]]) -> None:
+        """
+        Batch variant of notify(): dedup and level resolution run once per event,
+        then each notifier receives all of its eligible events in one call
+        (send_batch() for sync notifiers, one buffer extend for the others).
+        Event order is preserved per notifier.
+        """
+        if self._closed:
+            return
+        events = [data for data in events if not self._is_duplicate(data)]
+        if not events:
+            return
+        lvls = [level_value(str(data.get("level", "Info"))) for data in events]
+
+        for notifier, min_lvl in self._items:
+            selected = [data for data, lvl in zip(events, lvls) if lvl >= min_lvl]
+            if not selected:
                 continue
+            if notifier.sync:
+                self._safe_send_batch(notifier, selected)
+            else:
+                self._enqueue_many(notifier, selected)
+
+    def _enqueue(self, notifier: BaseNotifier, data: Dict[str, Any]) -> None:
+        self._enqueue_many(notifier, [data])
+
+    def _enqueue_many(self, notifier: BaseNotifier, events: List[Dict[str, Any]]) -> None:
+        start_drain = False
+        with self._pending_lock:
+            if self._closed:
+                return
+            batch = self._pending.setdefault(notifier, [])
+            batch.extend(events)
+            while len(batch) >= self._batch_max:
+                start_drain |= self._queue_batch_locked(notifier, batch[:self._batch_max])
+                del batch[:self._batch_max]
+            if not batch:
+                del self._pending[notifier]
+            elif self._flush_timer is None:
+                timer = threading.Timer(self._flush_interval, self.flush)
+                timer.daemon = True
+                self._flush_timer = timer
+                timer.start()
+        if start_drain:
+            self._start_drain(notifier)
+
+    def flush(self) -> None:
+        """Hand every buffered batch to the dispatch pool now."""
+        to_drain: List[BaseNotifier] = []
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+            timer, self._flush_timer = self._flush_timer, None
+            # Queued under the same lock as _enqueue_many, so outbox order = arrival order
+            for notifier, batch in pending.items():
+                if self._queue_batch_locked(notifier, batch):
+                    to_drain.append(notifier)
+        if timer is not None:
+            timer.cancel()  # no-op when flush() runs on the timer thread itself
+        for notifier in to_drain:
+            self._start_drain(notifier)
+
+    def _queue_batch_locked(self, notifier: BaseNotifier, batch: List[Dict[str, Any]]) -> bool:
+        """Append a batch to the notifier's outbox; True if a drain task must be started."""
+        self._outbox.setdefault(notifier, deque()).append(batch)
+        if notifier in self._draining:
+            return False
+        self._draining.add(notifier)
+        return True
+
+    def _start_drain(self, notifier: BaseNotifier) -> None:
+        try:
+            self._pool.submit(self._drain, notifier)
+        except RuntimeError:
+            # pool already shut down
+            with self._pending_lock:
+                self._draining.discard(notifier)
+                self._outbox.pop(notifier, None)
+
+    def _drain(self, notifier: BaseNotifier) -> None:
+        """Send the notifier's queued batches one by one until its outbox is empty."""
+        while True:
+            with self._pending_lock:
+                outbox = self._outbox.get(notifier)
+                if not outbox:
+                    self._outbox.pop(notifier, None)
+                    self._draining.discard(notifier)
+                    return
+                batch = outbox.popleft()
+            self._safe_send_batch(notifier, batch)
+
+    @staticmethod
+    def _safe_send(notifier: BaseNotifier, data: Dict[str, Any]) -> None:
+        try:
+            notifier.send(data)
+        except Exception:
+            # Don't let one notifier failure break others.
+            # In production, replace with proper logging.
+            pass
+
+    @staticmethod
+    def _safe_send_batch(notifier: BaseNotifier, batch: List[Dict[str, Any]]) -> None:
+        try:
+            notifier.send_batch(batch)
+        except Exception:
+            pass
+
+    async def notify_async(self, data: Dict[str, Any]) -> None:
+        """
+        notify() for code running inside an asyncio event loop. The whole dispatch
+        (including sync notifiers such as the console) runs on a worker thread, so
+        the loop is never blocked; ordering and batching are the same as notify().
+        """
+        await asyncio.to_thread(self.notify, data)
+
+    def shutdown(self) -> None:
+        """
+        Deliver everything still buffered, wait for the dispatch pool to finish all
+        pending sends, then close every registered notifier (e.g., pooled HTTP
+        connections). Events passed to notify() after shutdown() are ignored.
+        """
+        with self._pending_lock:
+            self._closed = True
+        self.flush()
+        self._pool.shutdown(wait=True)
+        for notifier, _ in self._items:
             try:
-                notifier.send(data)
+                notifier.close()
             except Exception:
-                # Don't let one notifier failure break others.
-                # In production, replace with proper logging.
                 continue
 
 
@@ -222,6 +611,7 @@ def _demo() -> None:
     mgr.add_notifier(ConsoleNotifier(include_json=False), minimum_level="Warning")
 
     mgr.notify(sample)
+    mgr.shutdown()
 
 
 if __name__ == "__main__":
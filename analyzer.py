@@ -13,9 +13,13 @@ Designed to be independent and easy to integrate with notification modules (e.g.
 
 from __future__ import annotations
 
+import bisect
+import functools
 import os
+import re
 from dataclasses import dataclass
-from typing import Dict, Optional, Tuple, Any, Literal
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Optional, Tuple, Any, Literal, Mapping
 
 EventDict = Dict[str, str]
 Level = Literal["Critical", "Warning", "Info"]
@@ -46,6 +50,15 @@ class AnalyzerConfig:
     critical_threshold: int = 70
 
 
+@functools.lru_cache(maxsize=4096)
+def _norm_abs_path(path: str) -> str:
+    """
+    절대경로 정규화 (normpath + 슬래시 통일). 입력만으로 결과가 정해지므로 캐시해도 안전.
+    같은 파일에 이벤트가 몰리는 경우가 많아 결과를 LRU 캐시에 보관함.
+    """
+    return os.path.normpath(path).replace("\\", "/")
+
+
 class EventAnalyzer:
     """
     파일 이벤트를 분석하여 위헙 점수와 등급(Critical/Warning/Info)를 할당함.
@@ -60,49 +73,67 @@ class EventAnalyzer:
         # 설정값이 없으면 기본 설정 사용
         self._cfg = config or AnalyzerConfig()
 
+        # 패턴들을 하나의 정규식으로 미리 컴파일 (이벤트당 한 번의 C 레벨 스캔)
+        # Empty pattern tuples compile to None so they never match.
+        exts = self._cfg.sensitive_exts
+        self._ext_re: Optional[re.Pattern[str]] = (
+            re.compile(r"(?:" + "|".join(re.escape(e) for e in exts) + r")\Z", re.IGNORECASE)
+            if exts else None
+        )
+        pats = self._cfg.sensitive_path_patterns
+        self._path_re: Optional[re.Pattern[str]] = (
+            re.compile("|".join(re.escape(p) for p in pats)) if pats else None
+        )
+
+        # 행위별 점수표 (if 분기 대신 dict 조회 한 번)
+        self._action_scores: Mapping[str, int] = MappingProxyType({
+            "deleted": self._cfg.score_deleted,
+            "modified": self._cfg.score_modified,
+            "created": self._cfg.score_created,
+        })
+
+        # 등급 임계치 (오름차순) 와 구간별 등급 이름
+        self._thresholds: Tuple[int, ...] = (self._cfg.warning_threshold, self._cfg.critical_threshold)
+        self._labels: Tuple[Level, ...] = ("Info", "Warning", "Critical")
+
     @staticmethod
     def _norm_path_for_match(path: str) -> str:
         """
         경로 비교를 위해 OS에 상관없이 동일한 포맷(절대경로, 슬래시 사용)으로 정규화.
+        상대경로/'~' 경로는 현재 작업 폴더와 $HOME에 따라 결과가 달라지므로
+        먼저 절대경로로 바꾼 뒤, 순수 함수인 나머지 정규화만 캐시를 거침.
         """
-        p = os.path.abspath(os.path.expanduser(path))
-        p = os.path.normpath(p)
-        return p.replace("\\", "/")
+        if not os.path.isabs(path):  # '~...' 도 여기에 해당
+            path = os.path.abspath(os.path.expanduser(path))
+        return _norm_abs_path(path)
 
     def _score_extension(self, path: str) -> int:
         """파일 확장자가 감시 대상(비밀키, 환경변수 등)인지 확인하여 점수를 부여함."""
-        # path.endswitch는 튜플을 받아서 하나라도 일치하면 True를 반환함.
-        if path.lower().endswith(self._cfg.sensitive_exts):
+        # 대소문자 무시 접미사 정규식이라 path.lower() 복사가 필요 없음.
+        if self._ext_re is not None and self._ext_re.search(path):
             return self._cfg.sensitive_ext_score
         return 0
 
     def _score_sensitive_path(self, norm_path: str) -> int:
         """파일이 위치한 경로가 보안상 중요한 위치(SSH 설정 등)인지 확인"""
         # Match patterns against normalized forward-slash path
-        for pat in self._cfg.sensitive_path_patterns:
-            if pat in norm_path:
-                return self._cfg.sensitive_path_score
+        if self._path_re is not None and self._path_re.search(norm_path):
+            return self._cfg.sensitive_path_score
         return 0
 
     def _score_action(self, action: str) -> int:
         """파일에 가해진 행위(생성/수정/삭제)에 따라 점수를 부여함."""
-        a = (action or "").strip().lower()
-        if a == "deleted":
-            return self._cfg.score_deleted
-        if a == "modified":
-            return self._cfg.score_modified
-        if a == "created":
-            return self._cfg.score_created
+        # Fast path: collector.py already emits canonical lowercase actions
+        score = self._action_scores.get(action)
+        if score is not None:
+            return score
         # Unknown action -> low baseline (but not zero, so it still shows up)
-        return 5 # 알 수 없는 행위는 기본 점수 5점
+        return self._action_scores.get((action or "").strip().lower(), 5) # 알 수 없는 행위는 기본 점수 5점
 
     def _level(self, score: int) -> Level:
         """합산된 최종 점수를 바탕으로 위협 등급을 결정함."""
-        if score > self._cfg.critical_threshold:
-            return "Critical"
-        if score > self._cfg.warning_threshold:
-            return "Warning"
-        return "Info"
+        # bisect_left = 점수보다 "작은" 임계치 개수 -> 임계치를 초과해야 등급 상승 (score > threshold)
+        return self._labels[bisect.bisect_left(self._thresholds, score)]
 
     def analyze(self, event: EventDict) -> Dict[str, Any]:
         """
@@ -131,6 +162,32 @@ class EventAnalyzer:
         out["level"] = self._level(score)
         return out
 
+    def analyze_many(self, events: Iterable[EventDict]) -> List[Dict[str, Any]]:
+        """
+        여러 이벤트를 한 번에 분석 (결과는 analyze()를 하나씩 호출한 것과 동일).
+        메서드/속성 조회를 루프 밖으로 빼서 배치 전체에 비용을 분산함.
+        """
+        events = list(events)
+        norm = self._norm_path_for_match
+        score_action = self._score_action
+        score_extension = self._score_extension
+        score_sensitive_path = self._score_sensitive_path
+        level = self._level
+
+        norm_paths = [norm(event.get("path", "")) for event in events]
+        results: List[Dict[str, Any]] = []
+        for event, norm_path in zip(events, norm_paths):
+            score = (
+                score_action(event.get("action", ""))
+                + score_extension(norm_path)
+                + score_sensitive_path(norm_path)
+            )
+            out: Dict[str, Any] = dict(event)
+            out["score"] = int(score)
+            out["level"] = level(score)
+            results.append(out)
+        return results
+
 
 def _demo() -> None:
     """분석기 모듈이 단독으로 잘 작동하는지 확인하기 위한 테스트 코드"""
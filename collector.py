@@ -1,40 +1,64 @@
 # collector.py
 """
-File system collector using watchdog.
+File system collector using watchdog (or raw inotify on Linux).
 
 Features:
 - Watch multiple directories (recursively by default)
-- Detect create/modify/delete events
+- Detect create/modify/delete events (a rename/move is reported as deleted + created)
 - Emit normalized event dict:
-  {'time': <ISO8601 UTC>, 'path': <str>, 'action': 'created'|'modified'|'deleted'}
+  {'time': <ISO8601 UTC, ms>, 'path': <str>, 'action': 'created'|'modified'|'deleted'}
 - Supports callback or internal queue polling
+- On Linux with inotify_simple installed, events are read from inotify in
+  batches by one thread; otherwise watchdog's Observer is used
 
 Requirements:
     pip install watchdog
+    pip install inotify_simple   # optional, Linux only
 """
 
 from __future__ import annotations
 
 import os
+import sys
 import time
-import queue
 import threading
+from collections import OrderedDict, deque
 from dataclasses import dataclass
-from datetime import datetime, timezone
-from typing import Callable, Dict, Iterable, List, Optional
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
 
 from watchdog.events import FileSystemEventHandler
 from watchdog.observers import Observer
 
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:  # optional dependency
+    INotify = None
+    inotify_flags = None
+
+# inotify 백엔드 사용 여부 (Linux + inotify_simple 설치 시)
+_USE_INOTIFY = INotify is not None and sys.platform.startswith("linux")
+
 # 타입 힌트 정의: 이벤트 데이터는 문자열 키와 값을 가진 딕셔너리 형태
 EventDict = Dict[str, str]
 EventCallback = Callable[[EventDict], None]
 
 
+# 마지막으로 만든 타임스탬프 (밀리초 값, 문자열) - 같은 밀리초 안의 이벤트는 재사용
+_last_iso = (-1, "")
+
+
 def _utc_iso() -> str:
-    # ISO 8601 in UTC with 'Z'
+    # ISO 8601 in UTC with 'Z', millisecond precision
     """분석의 용이성을 위해 현재 시간을 ISO 8601 UTC 포맷으로 반환"""
-    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    global _last_iso
+    ms = time.time_ns() // 1_000_000
+    cached_ms, cached = _last_iso
+    if cached_ms == ms:
+        return cached
+    sec, msec = divmod(ms, 1000)
+    iso = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec)) + ".%03dZ" % msec
+    _last_iso = (ms, iso)  # 튜플 통째로 교체 -> 다른 스레드가 어긋난 쌍을 읽을 일 없음
+    return iso
 
 
 def _norm_path(path: str) -> str:
@@ -53,6 +77,12 @@ class WatcherConfig:
 
 class _WatchdogHandler(FileSystemEventHandler):
     """Watchdog의 이벤트를 받아 시스템에 맞게 1차 가공하는 내부 클래스"""
+
+    # 디바운스 기록 상한 (오래 실행돼도 메모리가 계속 늘지 않도록)
+    _max_debounce_entries = 16384
+    # N번째 기록마다 오래된 항목(debounce_seconds * 4 초과)을 정리
+    _sweep_every = 1024
+
     def __init__(
         self,
         emit: Callable[[EventDict], None],
@@ -60,8 +90,11 @@ class _WatchdogHandler(FileSystemEventHandler):
     ) -> None:
         self._emit = emit
         self._config = config
-        self._last_seen = {}  # 중복 이벤트 방지를 위해 (행위, 경로) 별 마지막 발생 시간을 기록
-        self._lock = threading.Lock()
+        # 중복 이벤트 방지를 위해 (행위, 경로) 별 마지막 발생 시간을 스레드별로 기록
+        # (tls.last_seen: OrderedDict, tls.record_count: int - _debounce_state() 참고)
+        # watchdog은 같은 경로의 이벤트를 항상 같은 스레드에서 전달하므로
+        # 스레드별 기록으로 충분하고, 이벤트마다 lock을 잡을 필요가 없음.
+        self._tls = threading.local()
 
     def _should_ignore(self, event) -> bool:
         """설정에 따라 디렉토리 이벤트 필터링"""
@@ -79,13 +112,39 @@ class _WatchdogHandler(FileSystemEventHandler):
 
         key = (action, path)
         now = time.monotonic()
-        with self._lock:
-            last = self._last_seen.get(key)
-            if last is not None and (now - last) < self._config.debounce_seconds:
-                return True
-            self._last_seen[key] = now
+        tls = self._debounce_state()
+        last_seen = tls.last_seen
+        last = last_seen.get(key)
+        if last is not None and (now - last) < self._config.debounce_seconds:
+            return True
+        last_seen[key] = now
+        last_seen.move_to_end(key)
+        if len(last_seen) > self._max_debounce_entries:
+            last_seen.popitem(last=False)
+
+        tls.record_count += 1
+        if tls.record_count % self._sweep_every == 0:
+            self._evict_stale(last_seen, now)
         return False
 
+    def _debounce_state(self) -> threading.local:
+        """현재 스레드의 디바운스 기록을 반환 (처음 호출 시 생성)."""
+        tls = self._tls
+        if not hasattr(tls, "last_seen"):
+            # 기록 순서 = 시간 순서라서 맨 앞이 항상 가장 오래된 항목
+            tls.last_seen = OrderedDict()
+            tls.record_count = 0
+        return tls
+
+    def _evict_stale(self, last_seen: "OrderedDict[Tuple[str, str], float]", now: float) -> None:
+        """이미 디바운스 창을 한참 지난 항목들을 앞에서부터 제거."""
+        cutoff = now - self._config.debounce_seconds * 4
+        while last_seen:
+            oldest_key = next(iter(last_seen))
+            if last_seen[oldest_key] >= cutoff:
+                break
+            del last_seen[oldest_key]
+
     def _handle(self, action: str, src_path: str) -> None:
         """이벤트를 최종적으로 정규화하여 배출(Emit)함."""
         path = _norm_path(src_path)
@@ -116,6 +175,166 @@ class _WatchdogHandler(FileSystemEventHandler):
             return
         self._handle("deleted", event.src_path)
 
+    def on_moved(self, event) -> None:
+        # 이름 변경/이동 = 원래 경로 삭제 + 새 경로 생성 (inotify 백엔드와 동일하게 보고)
+        if self._should_ignore(event):
+            return
+        self._handle("deleted", event.src_path)
+        self._handle("created", event.dest_path)
+
+
+class _RawEvent(NamedTuple):
+    """_WatchdogHandler가 읽는 watchdog 이벤트 속성만 흉내 낸 최소 이벤트"""
+    src_path: str
+    is_directory: bool
+
+
+class _InotifyObserver:
+    """
+    watchdog Observer와 같은 인터페이스(schedule/start/stop/join)를 가진 inotify 백엔드.
+
+    스레드 하나가 inotify fd에서 이벤트를 묶음으로 읽음 (read 한 번에 여러 이벤트).
+    read_delay 동안 커널이 연속된 쓰기 이벤트를 모아 주므로 디바운스 부담도 줄어듦.
+
+    새 폴더 / 밖에서 들어온 폴더: 감시를 건 뒤 이미 들어 있는 항목을 created로 보고.
+
+    하위 폴더 이동 처리:
+      - 감시 트리 안에서 이동 (MOVED_FROM/MOVED_TO 쿠키 일치) -> 감시 경로 접두사만 갱신,
+        안의 항목은 옛 경로 deleted + 새 경로 created로 보고 (watchdog과 동일)
+      - 트리 밖으로 이동 (짝이 되는 MOVED_TO 없음) -> 해당 폴더와 하위 감시를 모두 해제
+        (해제하지 않으면 트리 밖 파일이 옛 경로로 보고됨)
+    """
+
+    _read_timeout_ms = 100  # stop() 확인 주기
+    _read_delay_ms = 10
+
+    def __init__(self) -> None:
+        self._inotify = INotify()
+        self._mask = (
+            inotify_flags.CREATE
+            | inotify_flags.MODIFY
+            | inotify_flags.ATTRIB   # touch/chmod -> modified (watchdog과 동일)
+            | inotify_flags.DELETE
+            | inotify_flags.MOVED_FROM
+            | inotify_flags.MOVED_TO
+        )
+        self._wd_paths: Dict[int, str] = {}      # watch descriptor -> 디렉토리 경로
+        self._wd_handler: Dict[int, Tuple[FileSystemEventHandler, bool]] = {}
+        self._moved_dirs: Dict[int, str] = {}    # MOVED_FROM 쿠키 -> 이동 전 폴더 경로
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="inotify-observer", daemon=True)
+
+    def schedule(self, handler: FileSystemEventHandler, path: str, recursive: bool = False) -> None:
+        if recursive:
+            for root, _dirs, _files in os.walk(path):
+                self._add_watch(handler, root, recursive)
+        else:
+            self._add_watch(handler, path, recursive)
+
+    def _add_watch(self, handler: FileSystemEventHandler, path: str, recursive: bool) -> None:
+        try:
+            wd = self._inotify.add_watch(path, self._mask)
+        except OSError:
+            return  # 권한 없음 / 이미 삭제됨 등은 건너뜀
+        self._wd_paths[wd] = path
+        self._wd_handler[wd] = (handler, recursive)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        try:
+            while not self._stop_event.is_set():
+                for ev in self._inotify.read(
+                    timeout=self._read_timeout_ms, read_delay=self._read_delay_ms
+                ):
+                    self._dispatch(ev)
+                # 같은 묶음에서 MOVED_TO 짝을 못 찾은 폴더 = 트리 밖으로 나감
+                # (짝이 다음 read로 넘어가도 그때 새 폴더로 다시 감시하므로 결과는 같음)
+                for old_path in self._moved_dirs.values():
+                    self._remove_watches_under(old_path)
+                self._moved_dirs.clear()
+        finally:
+            self._inotify.close()
+
+    def _wds_under(self, path: str) -> List[int]:
+        prefix = path + os.sep
+        return [
+            wd for wd, p in self._wd_paths.items()
+            if p == path or p.startswith(prefix)
+        ]
+
+    def _remove_watches_under(self, path: str) -> None:
+        for wd in self._wds_under(path):
+            try:
+                self._inotify.rm_watch(wd)
+            except OSError:
+                pass  # 이미 커널에서 해제됨
+            self._wd_paths.pop(wd, None)
+            self._wd_handler.pop(wd, None)
+
+    def _rename_watches_under(self, old_path: str, new_path: str) -> None:
+        for wd in self._wds_under(old_path):
+            self._wd_paths[wd] = new_path + self._wd_paths[wd][len(old_path):]
+
+    @staticmethod
+    def _report_existing(
+        handler: FileSystemEventHandler, path: str, old_path: Optional[str] = None
+    ) -> None:
+        """
+        폴더 안에 이미 있는 항목들을 created로 보고 (old_path가 있으면 이동 전 경로의 deleted도 함께).
+        중복 보고는 _WatchdogHandler의 디바운스가 걸러 줌.
+        """
+        for root, dirs, files in os.walk(path):
+            for name, is_dir in [(d, True) for d in dirs] + [(f, False) for f in files]:
+                new_entry = os.path.join(root, name)
+                if old_path is not None:
+                    handler.on_deleted(_RawEvent(old_path + new_entry[len(path):], is_dir))
+                handler.on_created(_RawEvent(new_entry, is_dir))
+
+    def _dispatch(self, ev) -> None:
+        mask = ev.mask
+        if mask & inotify_flags.IGNORED:
+            # 감시 중이던 디렉토리가 사라짐 -> 매핑 정리
+            self._wd_paths.pop(ev.wd, None)
+            self._wd_handler.pop(ev.wd, None)
+            return
+
+        parent = self._wd_paths.get(ev.wd)
+        if parent is None:
+            return
+        handler, recursive = self._wd_handler[ev.wd]
+        path = os.path.join(parent, ev.name) if ev.name else parent
+        is_dir = bool(mask & inotify_flags.ISDIR)
+        raw = _RawEvent(path, is_dir)
+
+        if mask & (inotify_flags.CREATE | inotify_flags.MOVED_TO):
+            handler.on_created(raw)
+            if is_dir and recursive:
+                old_path = self._moved_dirs.pop(ev.cookie, None) if mask & inotify_flags.MOVED_TO else None
+                if old_path is not None:
+                    # 트리 안에서 이동: 감시 경로만 갱신하고, 안의 항목은 watchdog처럼
+                    # 옛 경로 삭제 + 새 경로 생성으로 보고
+                    self._rename_watches_under(old_path, path)
+                    self._report_existing(handler, path, old_path)
+                else:
+                    # 새 하위 폴더도 감시. 감시가 걸리기 전(최소 read_delay)에 이미
+                    # 만들어진 내용은 이벤트가 없으므로 직접 훑어서 생성으로 보고
+                    self.schedule(handler, path, recursive=True)
+                    self._report_existing(handler, path)
+        elif mask & (inotify_flags.MODIFY | inotify_flags.ATTRIB):
+            handler.on_modified(raw)
+        elif mask & (inotify_flags.DELETE | inotify_flags.MOVED_FROM):
+            if is_dir and mask & inotify_flags.MOVED_FROM:
+                self._moved_dirs[ev.cookie] = path  # MOVED_TO 짝이 오면 이름만 갱신
+            handler.on_deleted(raw)
+
 
 class FileWatcher:
     """
@@ -125,7 +344,7 @@ class FileWatcher:
     Watch multiple directories for create/modify/delete events.
 
     Usage patterns:
-    1) Callback-driven:
+    1) Callback-driven (no internal queue unless use_queue=True):
         def cb(ev): print(ev)
         fw = FileWatcher(["/tmp/a", "/tmp/b"], callback=cb)
         fw.start()
@@ -148,8 +367,10 @@ class FileWatcher:
         debounce_seconds: float = 0.15,
         ignore_directories: bool = True,
         queue_maxsize: int = 0,
+        use_queue: bool = False,
     ) -> None:
         self._paths: List[str] = [_norm_path(p) for p in paths]
+        self._validate_paths()
         self._callback = callback
         self._config = WatcherConfig(
             recursive=recursive,
@@ -157,16 +378,21 @@ class FileWatcher:
             ignore_directories=ignore_directories,
         )
         
-        # thread-safe한 큐를 사용하여 수집된 이벤트를 안전하게 보관
-        self._events: "queue.Queue[EventDict]" = queue.Queue(maxsize=queue_maxsize)
-        self._observer = Observer()
+        # 수집된 이벤트 보관용 deque: append/popleft는 GIL 하에서 원자적이라
+        # queue.Queue처럼 이벤트마다 mutex + condition 신호를 거치지 않음.
+        # 콜백만 쓰는 경우에는 큐를 만들지 않아 이벤트당 put 비용을 없앰
+        self._events: "Optional[deque[EventDict]]" = (
+            deque() if use_queue or callback is None else None
+        )
+        self._queue_maxsize = queue_maxsize  # 0 이하면 무제한
+        self._has_event = threading.Event()  # get_event()의 대기용 신호
+        # Observer는 start()에서 생성 (inotify fd를 시작 전/검증 실패 시 열어 두지 않도록)
+        self._observer: Optional[Observer] = None
         self._handler = _WatchdogHandler(self._emit, self._config)
 
         self._running = False
         self._lock = threading.Lock()
 
-        self._validate_paths()
-
     def _validate_paths(self) -> None:
         """감시하려는 경로가 실제로 존재하는 폴더인지 확인."""
         if not self._paths:
@@ -177,10 +403,13 @@ class FileWatcher:
 
     def _emit(self, event: EventDict) -> None:
         """이벤트 발생 시 큐에 넣고, 설정된 콜백 함수가 있다면 실행."""
-        try:
-            self._events.put_nowait(event)
-        except queue.Full:
-            pass # 큐가 꽉 찼을 경우 최신 이벤트를 버려 시스템 부하를 방지
+        if self._events is not None:
+            if 0 < self._queue_maxsize <= len(self._events):
+                pass # 큐가 꽉 찼을 경우 최신 이벤트를 버려 시스템 부하를 방지
+            else:
+                self._events.append(event)
+                if not self._has_event.is_set():  # 이미 켜져 있으면 Event 내부 lock 생략
+                    self._has_event.set()
 
         if self._callback is not None:
             try:
@@ -198,6 +427,7 @@ class FileWatcher:
             if self._running:
                 return
 
+            self._observer = _InotifyObserver() if _USE_INOTIFY else Observer()
             for p in self._paths:
                 self._observer.schedule(
                     self._handler,
@@ -224,24 +454,45 @@ class FileWatcher:
         """
         분석 모듈에서 큐에 쌓인 이벤트를 하나씩 꺼내갈 때 사용.
         Poll one event from internal queue.
-        Returns None on timeout.
+        Returns None on timeout (or immediately if the queue is disabled).
         """
-        try:
-            return self._events.get(timeout=timeout)
-        except queue.Empty:
+        events = self._events
+        if events is None:
             return None
 
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                return events.popleft()
+            except IndexError:
+                pass
+            # Clear, then re-check, so an append racing with clear() is never missed.
+            self._has_event.clear()
+            if events:
+                continue
+            if deadline is None:
+                self._has_event.wait()
+            else:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._has_event.wait(remaining):
+                    try:
+                        return events.popleft()
+                    except IndexError:
+                        return None
+
     def drain_events(self, limit: Optional[int] = None) -> List[EventDict]:
         """
         Drain queued events quickly (non-blocking).
         """
         out: List[EventDict] = []
-        while True:
-            if limit is not None and len(out) >= limit:
-                break
+        events = self._events
+        if events is None:
+            return out
+        popleft = events.popleft
+        while limit is None or len(out) < limit:
             try:
-                out.append(self._events.get_nowait())
-            except queue.Empty:
+                out.append(popleft())
+            except IndexError:
                 break
         return out
     
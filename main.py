@@ -1,4 +1,5 @@
 import sys
+import threading
 import time
 from collector import FileWatcher
 from analyzer import EventAnalyzer
@@ -18,20 +19,49 @@ def main():
     notifier_mgr = NotificationManager(minimum_level="Info")
     notifier_mgr.add_notifier(ConsoleNotifier(), minimum_level="Info")
 
-    # 콜백 함수: Collector가 던져준 데이터를 Analyzer와 Notifier로 연결
-    def on_event(event):
-        analyzed_data = analyzer.analyze(event)
-        notifier_mgr.notify(analyzed_data)
+    # 소비자 스레드: Collector는 큐에 넣기만 하고, 분석/알림은 이 스레드가 묶음으로 처리
+    # (알림 지연이 watchdog 수신 스레드를 막아 이벤트를 놓치는 일을 방지)
+    stop_event = threading.Event()
+
+    def process(batch):
+        try:
+            notifier_mgr.notify_many(analyzer.analyze_many(batch))
+        except Exception:
+            pass # 한 묶음의 오류로 소비자 스레드가 죽지 않도록 함
+
+    def consume(watcher):
+        while not stop_event.is_set():
+            batch = watcher.drain_events(limit=64)
+            if not batch:
+                event = watcher.get_event(timeout=0.2)
+                if event is None:
+                    continue
+                batch = [event]
+            process(batch)
+
+        # 종료 직전에 큐에 남은 이벤트도 빠짐없이 처리 (Ctrl+C 직전의 경보 유실 방지)
+        while True:
+            batch = watcher.drain_events(limit=64)
+            if not batch:
+                break
+            process(batch)
 
     print(f"🚀Security System 기동... (감시 구역: {watch_paths})")
     
-    # 2. 지정된 경로들로 FileWatcher 실행
-    with FileWatcher(paths=watch_paths, callback=on_event) as watcher:
+    # 2. 지정된 경로들로 FileWatcher 실행 (큐 폴링 방식)
+    with FileWatcher(paths=watch_paths, callback=None, queue_maxsize=10000) as watcher:
+        consumer = threading.Thread(target=consume, args=(watcher,), name="consumer", daemon=True)
+        consumer.start()
         try:
             while True:
                 time.sleep(1)
         except KeyboardInterrupt:
             print("\n🛑 시스템 종료")
+        finally:
+            watcher.stop()      # 새 이벤트 수집을 먼저 멈춰야 남은 큐가 유한해짐
+            stop_event.set()
+            consumer.join()     # 소비자가 큐를 모두 비운 뒤 종료될 때까지 대기
+            notifier_mgr.shutdown()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file